@@ -1,6 +1,7 @@
 # coding=utf-8
 from .grab import cams
 from . import write
+from . import summary
 
 __version__ = '0.0.0'
 __all__ = ["cams"]
@@ -0,0 +1,240 @@
+import os
+import glob
+import json
+import xarray as xr
+import numpy as np
+
+
+def summary_filename(filename):
+    '''
+    Returns the filename of the companion summary file of a data file,
+    e.g. FLIR_<id>__<time>.nc -> FLIR_<id>__<time>_summary.nc
+    '''
+    return os.path.splitext(filename)[0] + '_summary.nc'
+
+
+def summarize_netcdf(filename, rois=None, factors=(4, 16), chunksize=100,
+                     silent=False):
+    '''
+    Function that writes a small summary of a netcdf file made by
+    writeappend_netcdf, to allow browsing the archive without having to read
+    the full resolution data.
+
+        Parameters
+        ----------
+        filename : string
+            Path to the FLIR_<id>__<time>.nc file to summarize
+        rois : dict, optional
+            Regions of interest, as {name: (y0, y1, x0, x1)} in pixel
+            indices. The mean temperature of each region is stored per frame
+        factors : tuple of int
+            Downsampling factors of the thumbnails. A factor of 4 gives a
+            thumbnail at 1/4 of the resolution along both axes
+        chunksize : int
+            Number of frames read at a time, limiting the memory use
+        silent : bool
+            If True, do not print progress
+
+        Returns
+        -------
+        filename of the summary file
+
+    '''
+    if rois is None:
+        rois = {}
+
+    out_filename = summary_filename(filename)
+
+    if not silent:
+        print('Summarizing ' + os.path.basename(filename) + '...')
+
+    with xr.open_dataset(filename) as ds:
+        temperature = ds['temperature']
+        n_frames = temperature.sizes['time']
+
+        for name, (y0, y1, x0, x1) in rois.items():
+            if not (0 <= y0 < y1 <= temperature.sizes['y']
+                    and 0 <= x0 < x1 <= temperature.sizes['x']):
+                raise ValueError(
+                    'ROI {} {} is empty or outside of the {}x{} image'.format(
+                        name, (y0, y1, x0, x1),
+                        temperature.sizes['y'], temperature.sizes['x']))
+
+        parts = []
+        for ii in range(0, n_frames, chunksize):
+            frames = temperature.isel(time=slice(ii, ii + chunksize)).load()
+            parts.append(_summarize_frames(frames, rois, factors))
+
+        summary = xr.concat(parts, dim='time')
+
+    summary.attrs['source'] = os.path.basename(filename)
+    summary.attrs['factors'] = list(factors)
+    summary.attrs['rois'] = _rois_to_attr(rois)
+    summary.time.encoding['units'] = 'days since 1900-01-01'
+
+    # Generate encoding
+    encoding = {}
+    for key in summary.keys():
+        encoding[key] = {'zlib': True,
+                         'complevel': 4}
+
+    summary.to_netcdf(out_filename, encoding=encoding)
+
+    return out_filename
+
+
+def _summarize_frames(frames, rois, factors):
+    '''
+    Returns a dataset with the per-frame statistics, roi means and thumbnails
+    of a (time, y, x) DataArray.
+    '''
+    summary = xr.Dataset(
+        data_vars={'temperature_min': frames.min(dim=('y', 'x')),
+                   'temperature_mean': frames.mean(dim=('y', 'x')),
+                   'temperature_max': frames.max(dim=('y', 'x'))}
+        )
+
+    if rois:
+        roi_means = [frames.isel(y=slice(y0, y1), x=slice(x0, x1)).mean(
+            dim=('y', 'x')) for y0, y1, x0, x1 in rois.values()]
+        summary['roi_mean'] = xr.concat(roi_means, dim='roi').assign_coords(
+            roi=list(rois.keys())).transpose('time', 'roi')
+
+    for factor in factors:
+        thumbnail = frames.coarsen(y=factor, x=factor, boundary='trim').mean()
+        summary['temperature_' + str(factor)] = thumbnail.rename(
+            {'y': 'y_' + str(factor), 'x': 'x_' + str(factor)}
+            ).astype(np.float32)
+
+    return summary
+
+
+def _rois_to_attr(rois):
+    '''
+    Returns the rois as a json string, as netcdf attributes can not be dicts.
+    '''
+    return json.dumps({name: [int(bound) for bound in bounds]
+                       for name, bounds in rois.items()})
+
+
+def _summary_matches(filename, rois, factors):
+    '''
+    Checks if an existing summary file was made with the same rois and
+    factors, so that all summaries in the archive can be concatenated.
+    '''
+    with xr.open_dataset(filename) as summary:
+        return (summary.attrs.get('rois') == _rois_to_attr(rois)
+                and list(np.atleast_1d(summary.attrs['factors']))
+                == list(factors))
+
+
+def _camera_id(filename):
+    '''
+    Returns the camera id from a FLIR_<id>__<time>.nc filename.
+    '''
+    return os.path.basename(filename)[len('FLIR_'):].split('__')[0]
+
+
+def write_index(directory, silent=False):
+    '''
+    Function that writes an index of all summary files in a directory, with
+    one entry per data file. Written to thermalpy_index.nc in the directory.
+
+        Parameters
+        ----------
+        directory : string
+            Path to directory containing the summary files
+        silent : bool
+            If True, do not print progress
+
+        Returns
+        -------
+        filename of the index file
+
+    '''
+    filenames = sorted(glob.glob(os.path.join(directory, 'FLIR_*__*_summary.nc')))
+
+    entries = {'camera_id': [], 'filename': [], 'n_frames': [],
+               'time_start': [], 'time_end': [],
+               'temperature_min': [], 'temperature_mean': [],
+               'temperature_max': []}
+
+    for filename in filenames:
+        with xr.open_dataset(filename) as summary:
+            entries['camera_id'].append(_camera_id(filename))
+            entries['filename'].append(summary.attrs['source'])
+            entries['n_frames'].append(summary.sizes['time'])
+            entries['time_start'].append(summary.time.values.min())
+            entries['time_end'].append(summary.time.values.max())
+            entries['temperature_min'].append(
+                float(summary.temperature_min.min()))
+            entries['temperature_mean'].append(
+                float(summary.temperature_mean.mean()))
+            entries['temperature_max'].append(
+                float(summary.temperature_max.max()))
+
+    if not silent:
+        print('Indexed {} files'.format(len(filenames)))
+
+    index = xr.Dataset(
+        data_vars={key: ('file', values) for key, values in entries.items()})
+    index.time_start.encoding['units'] = 'days since 1900-01-01'
+    index.time_end.encoding['units'] = 'days since 1900-01-01'
+
+    out_filename = os.path.join(directory, 'thermalpy_index.nc')
+    index.to_netcdf(out_filename)
+
+    return out_filename
+
+
+def summarize_directory(directory, rois=None, factors=(4, 16),
+                        overwrite=False, skip_latest=True, silent=False):
+    '''
+    Function that summarizes all data files in a directory and updates the
+    index. Files are only (re)summarized when their summary is missing,
+    older than the data file or made with other rois or factors. The newest
+    file of each camera is skipped, as writeappend_netcdf fails to open a
+    file that is being read.
+
+        Parameters
+        ----------
+        directory : string
+            Path to directory containing the FLIR_<id>__<time>.nc files
+        rois : dict, optional
+            Regions of interest, see summarize_netcdf
+        factors : tuple of int
+            Downsampling factors of the thumbnails, see summarize_netcdf
+        overwrite : bool
+            If True, summarize all files regardless of existing summaries
+        skip_latest : bool
+            If True, skip the newest file of each camera, which may still be
+            written to. Set to False once logging has stopped
+        silent : bool
+            If True, do not print progress
+
+        Returns
+        -------
+        filename of the index file
+
+    '''
+    filenames = sorted(glob.glob(os.path.join(directory, 'FLIR_*__*.nc')))
+    filenames = [fn for fn in filenames if not fn.endswith('_summary.nc')]
+
+    if skip_latest:
+        # Filenames sort by time, so the last one per camera is the newest
+        latest = {_camera_id(fn): fn for fn in filenames}
+        filenames = [fn for fn in filenames if fn not in latest.values()]
+
+    if rois is None:
+        rois = {}
+
+    for filename in filenames:
+        out_filename = summary_filename(filename)
+        if (not overwrite and os.path.isfile(out_filename)
+                and os.path.getmtime(out_filename) >= os.path.getmtime(filename)
+                and _summary_matches(out_filename, rois, factors)):
+            continue
+
+        summarize_netcdf(filename, rois=rois, factors=factors, silent=silent)
+
+    return write_index(directory, silent=silent)
@@ -0,0 +1,104 @@
+# Script to test the thermalpy summary code on synthetic data
+
+# %%
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+import numpy as np
+import xarray as xr
+
+# Import the summary module directly, as importing the thermalpy package
+# requires PySpin
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src', 'thermalpy'))
+import summary
+
+output_dir = tempfile.mkdtemp()
+
+def make_file(directory, camera_id, start, n_frames=7, shape=(64, 80)):
+    temperature_data = (np.random.rand(n_frames, *shape) * 10 + 20
+                        ).astype(np.float32)
+    temperature_data[3] = np.nan  # failed frame, as written by camera_test.py
+
+    ds = xr.Dataset(
+        data_vars={'temperature': (('time', 'y', 'x'), temperature_data)},
+        coords={'time': [start + timedelta(seconds=ii)
+                         for ii in range(n_frames)],
+                'y': np.arange(shape[0], 0, -1),
+                'x': np.arange(shape[1])}
+            )
+    ds.time.encoding['units'] = 'days since 1900-01-01'
+
+    filename = os.path.join(
+        directory, 'FLIR_' + camera_id + '__'
+        + start.strftime('%Y_%m_%d_%H00') + '.nc')
+    ds.to_netcdf(filename, unlimited_dims='time')
+    return filename, temperature_data
+
+# %% Empty directory gives an empty index
+index = xr.open_dataset(summary.write_index(output_dir, silent=True))
+assert index.sizes.get('file', 0) == 0
+index.close()
+
+# %% Summary matches the full data, chunked or not
+rois = {'a': (0, 10, 0, 10), 'b': (5, 20, 30, 60)}
+filename, data = make_file(output_dir, '123', datetime(2020, 11, 4, 10))
+
+summary.summarize_netcdf(filename, rois=rois, chunksize=3, silent=True)
+with xr.open_dataset(summary.summary_filename(filename)) as ds:
+    chunked = ds.load()
+summary.summarize_netcdf(filename, rois=rois, silent=True)
+with xr.open_dataset(summary.summary_filename(filename)) as ds:
+    unchunked = ds.load()
+
+xr.testing.assert_identical(chunked, unchunked)
+
+valid = ~np.isnan(data).all(axis=(1, 2))
+np.testing.assert_allclose(unchunked.temperature_min[valid],
+                           np.nanmin(data[valid], axis=(1, 2)))
+np.testing.assert_allclose(unchunked.temperature_mean[valid],
+                           np.nanmean(data[valid], axis=(1, 2)), rtol=1e-6)
+np.testing.assert_allclose(unchunked.temperature_max[valid],
+                           np.nanmax(data[valid], axis=(1, 2)))
+assert unchunked.temperature_mean[~valid].isnull().all()
+
+y0, y1, x0, x1 = rois['b']
+np.testing.assert_allclose(unchunked.roi_mean.sel(roi='b')[valid],
+                           data[valid, y0:y1, x0:x1].mean(axis=(1, 2)),
+                           rtol=1e-6)
+
+for factor in (4, 16):
+    ny, nx = data.shape[1] // factor, data.shape[2] // factor
+    expected = data[:, :ny * factor, :nx * factor].reshape(
+        -1, ny, factor, nx, factor).mean(axis=(2, 4))
+    np.testing.assert_allclose(
+        unchunked['temperature_' + str(factor)][valid], expected[valid],
+        rtol=1e-6)
+
+# %% Invalid ROIs are refused
+for bad_roi in [(10, 5, 0, 10), (0, 10, 70, 90), (0, 0, 0, 10)]:
+    try:
+        summary.summarize_netcdf(filename, rois={'bad': bad_roi}, silent=True)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('ROI {} was accepted'.format(bad_roi))
+
+# %% summarize_directory skips the newest file and redoes changed settings
+latest, _ = make_file(output_dir, '123', datetime(2020, 11, 4, 11))
+
+summary.summarize_directory(output_dir, rois=rois, silent=True)
+assert not os.path.isfile(summary.summary_filename(latest))
+
+summary.summarize_directory(output_dir, rois={'a': rois['a']}, silent=True)
+with xr.open_dataset(summary.summary_filename(filename)) as ds:
+    assert list(ds.roi.values) == ['a']
+
+index_filename = summary.summarize_directory(
+    output_dir, rois={'a': rois['a']}, skip_latest=False, silent=True)
+with xr.open_dataset(index_filename) as index:
+    assert index.sizes['file'] == 2
+    assert list(index.camera_id.values) == ['123', '123']
+    assert int(index.n_frames.sum()) == 14
+
+print('All summary tests passed')